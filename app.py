@@ -4,21 +4,27 @@
 设计思路：
 1. 使用Streamlit的简洁表单界面收集用户输入
 2. 调用计算器模块进行计算
-3. 使用Plotly绘制交互式折线图
+3. 使用Plotly绘制折线图（默认静态图片，可切换为交互式）
 4. 显示结果表格和文本提示
 5. 提供PDF导出功能
 """
 
+import logging
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from datetime import datetime
-from io import BytesIO
-from calculator import StudyCostCalculator, InvalidInputError, CalculationError
-from pdf_generator import generate_pdf_report
+from typing import TYPE_CHECKING, Dict
+from calculator import (
+    StudyCostCalculator, InvalidInputError, CalculationError
+)
 from city_database import get_countries, get_cities, get_city_data, get_currency_symbol
 
+# plotly、pdf_generator（fpdf/reportlab）等较重的模块在实际使用时才导入，加快启动和首屏渲染
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+logger = logging.getLogger(__name__)
+
 # 页面配置
 st.set_page_config(
     page_title="留学生成本计算器",
@@ -28,7 +34,7 @@ st.set_page_config(
 )
 
 # 自定义CSS样式
-st.markdown("""
+_CSS = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -58,10 +64,147 @@ st.markdown("""
         margin: 1rem 0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+
+# 使用指南文案（静态内容）
+_GUIDE_LEFT = """
+#### 🎯 快速开始（4步）
+
+1. **🌍 选择留学目的地**
+   - 先选择国家，再选择城市
+   - 系统自动显示该城市的货币信息
+
+2. **🏠 选择住宿类型**
+   - 单间/合租/宿舍
+   - 系统自动匹配该城市的房租数据
+
+3. **💼 填写打工信息**（可选）
+   - 勾选「是否打工」
+   - 填写每周工作小时数
+   - **手动输入小时工资**（必须填写）
+
+4. **💰 输入财务信息**
+   - 初始存款（当地货币）
+   - 学费总额（当地货币）
+   - 学费支付方式
+"""
+
+_GUIDE_RIGHT = """
+#### 📊 查看结果
+
+- **关键指标**：月收入、月支出、最终余额、最低余额
+- **12个月现金流明细表**：详细展示每月收支情况
+- **可视化图表**：累计余额趋势 + 月度收入支出对比
+- **危险月份提醒**：自动标识资金紧张的月份
+- **数据来源**：点击查看每项成本的数据依据
+- **导出报告**：支持CSV、Excel、PDF格式
+"""
+
+_TAB1 = """
+#### 📚 数据来源和依据
+
+- **生活成本数据**：来自Numbeo、Expatistan、各国官方统计局等权威机构
+- **数据更新**：基于2024年最新统计数据
+- **数据范围**：包括房租（单间/合租/宿舍）和月生活费（食物、交通、娱乐等）
+- **查看来源**：计算完成后，点击「📚 数据来源和依据」查看详细来源
+
+⚠️ **免责声明**：数据仅供参考，实际成本可能因个人情况、地区差异、时间变化而有所不同。
+"""
+
+_TAB2 = """
+#### ⚠️ 使用注意事项
+
+1. **小时工资必须手动输入**
+   - 系统不会自动填充默认值
+   - 如果勾选了「是否打工」但小时工资为0，系统会提示
+   - 建议根据实际或预期工资填写
+
+2. **货币单位**
+   - 所有金额使用当地货币
+   - 系统自动识别并显示正确的货币符号
+   - 如需转换，请使用实时汇率
+
+3. **计算结果**
+   - 如果余额为负（红色区域），表示该月资金不足
+   - 系统会计算需要父母补钱的金额
+   - 建议增加初始存款或调整支出计划
+
+4. **数据准确性**
+   - 生活成本数据为平均值，仅供参考
+   - 实际成本可能因个人消费习惯而异
+   - 建议结合个人实际情况调整
+"""
+
+_TAB3 = """
+#### ❓ 常见问题
+
+**Q1: 如何选择住宿类型？**
+- 单间：独立房间，通常包含独立卫浴，价格较高
+- 合租：与他人共享公共区域，价格经济实惠
+- 宿舍：学校提供的学生宿舍，通常包含基本设施，价格适中
+
+**Q2: 小时工资应该填多少？**
+- 请填写你的实际或预期小时工资
+- 不同行业和职位工资差异较大
+- 建议查看当地招聘网站或咨询就业市场信息
+
+**Q3: 学费分期支付是什么意思？**
+- 分期支付：分10个月（9月到次年6月）平均支付
+- 每月支付金额 = 学费总额 ÷ 10
+- 适合资金紧张的情况，可以分散支出压力
+
+**Q4: 如果余额为负怎么办？**
+- 系统会标识危险月份和需要补钱的金额
+- 建议：增加初始存款、增加工作时间、选择更便宜的住宿方式
+
+**Q5: 数据来源可靠吗？**
+- 数据来自Numbeo、Expatistan、各国官方统计局等权威机构
+- 点击「数据来源和依据」可查看详细来源
+- 数据基于2024年最新统计，但仅供参考
+"""
+
+_FEATURES = """
+- 🌍 **全球支持**：20+个国家，50+个城市
+- 📚 **数据透明**：每项成本都有明确的来源依据
+- 💰 **灵活配置**：支持自定义小时工资
+- 📊 **可视化分析**：图表直观展示现金流趋势
+- 📥 **多格式导出**：支持CSV、Excel、PDF
+- ⚠️ **智能提醒**：自动识别危险月份和资金缺口
+"""
+
+
+@st.cache_resource(show_spinner=False)
+def _inject_css() -> None:
+    """注入自定义CSS样式（缓存后由Streamlit在重跑时回放，不再重复构建）"""
+    st.markdown(_CSS, unsafe_allow_html=True)
+
+
+# 城市数据库查询缓存（静态数据，首次查询后直接从内存返回）
+@st.cache_data(show_spinner=False)
+def _countries() -> list:
+    return get_countries()
+
+
+@st.cache_data(show_spinner=False)
+def _cities(country: str) -> list:
+    return get_cities(country)
+
+
+@st.cache_data(show_spinner=False)
+def _city_data(country: str, city: str):
+    return get_city_data(country, city)
+
+
+@st.cache_data(show_spinner=False)
+def _currency_symbol(currency_code: str) -> str:
+    return get_currency_symbol(currency_code)
+
 
 def main():
     """主函数"""
+    _inject_css()
+    
     # 标题
     st.markdown('<div class="main-header">💰 留学生成本计算器</div>', unsafe_allow_html=True)
     st.markdown("---")
@@ -72,7 +215,7 @@ def main():
         st.markdown("---")
         
         # 国家选择
-        countries = get_countries()
+        countries = _countries()
         country = st.selectbox(
             "选择国家",
             countries,
@@ -80,7 +223,7 @@ def main():
         )
         
         # 城市选择（根据国家动态更新）
-        cities = get_cities(country)
+        cities = _cities(country)
         city = st.selectbox(
             "选择城市",
             cities,
@@ -88,17 +231,8 @@ def main():
         )
         
         # 获取城市数据以显示货币信息
-        city_data = get_city_data(country, city)
-        currency_symbol = get_currency_symbol(city_data.currency) if city_data else "€"
-        
-        # 房租类型
-        rent_type = st.selectbox(
-            "房租类型",
-            ["单间", "合租", "宿舍"],
-            help="**单间**：独立房间，通常包含独立卫浴；**合租**：与他人共享公共区域，价格更经济；**宿舍**：学校提供的学生宿舍，通常包含基本设施。选择后系统会自动匹配该城市对应类型的平均房租。"
-        )
-        
-        st.markdown("---")
+        city_data = _city_data(country, city)
+        currency_symbol = _currency_symbol(city_data.currency) if city_data else "€"
         
         # 打工信息
         has_job = st.checkbox(
@@ -106,61 +240,75 @@ def main():
             help="💼 勾选此项表示你在留学期间有兼职工作。勾选后需要填写每周工作小时数和小时工资。如果不打工，月收入将计算为0。"
         )
         
-        weekly_hours = 0.0
-        hourly_wage = 0.0
-        if has_job:
-            weekly_hours = st.number_input(
-                "每周工作小时数",
+        # 其余输入放入表单，仅在点击「开始计算」时统一提交，避免每次修改都触发重算
+        # （国家/城市/是否打工决定表单内容，需保留在表单外即时更新）
+        with st.form("inputs"):
+            # 房租类型
+            rent_type = st.selectbox(
+                "房租类型",
+                ["单间", "合租", "宿舍"],
+                help="**单间**：独立房间，通常包含独立卫浴；**合租**：与他人共享公共区域，价格更经济；**宿舍**：学校提供的学生宿舍，通常包含基本设施。选择后系统会自动匹配该城市对应类型的平均房租。"
+            )
+            
+            st.markdown("---")
+            
+            weekly_hours = 0.0
+            hourly_wage = 0.0
+            if has_job:
+                weekly_hours = st.number_input(
+                    "每周工作小时数",
+                    min_value=0.0,
+                    max_value=40.0,
+                    value=10.0,
+                    step=0.5,
+                    help="⏰ 请输入你每周计划工作的小时数。注意：不同国家对留学生打工时间有不同限制（通常为每周20-40小时），请确保符合当地法律法规。系统会按每月4.33周计算月工作小时数。"
+                )
+                
+                # 手动输入小时工资（无默认值，用户必须输入）
+                hourly_wage = st.number_input(
+                    f"小时工资（{currency_symbol}）",
+                    min_value=0.0,
+                    value=0.0,
+                    step=0.5,
+                    help=f"💰 请输入你的实际或预期小时工资（{currency_symbol}）。系统会根据「每周工作小时数 × 4.33周 × 小时工资」计算月收入。💡 提示：不同行业和职位工资差异较大，建议咨询当地就业市场信息或查看招聘网站。"
+                )
+            
+            st.markdown("---")
+            
+            # 财务信息
+            initial_deposit = st.number_input(
+                f"初始存款（{currency_symbol}）",
                 min_value=0.0,
-                max_value=40.0,
-                value=10.0,
-                step=0.5,
-                help="⏰ 请输入你每周计划工作的小时数。注意：不同国家对留学生打工时间有不同限制（通常为每周20-40小时），请确保符合当地法律法规。系统会按每月4.33周计算月工作小时数。"
+                value=5000.0,
+                step=100.0,
+                help=f"💵 请输入你开始留学时拥有的存款金额（{currency_symbol}）。这是你计算现金流的起始资金。建议包括：学费、生活费、应急资金等。如果初始存款不足，系统会提示需要父母支持。"
             )
             
-            # 手动输入小时工资（无默认值，用户必须输入）
-            hourly_wage = st.number_input(
-                f"小时工资（{currency_symbol}）",
+            tuition_total = st.number_input(
+                f"学费总额（{currency_symbol}）",
                 min_value=0.0,
-                value=0.0,
-                step=0.5,
-                help=f"💰 请输入你的实际或预期小时工资（{currency_symbol}）。系统会根据「每周工作小时数 × 4.33周 × 小时工资」计算月收入。💡 提示：不同行业和职位工资差异较大，建议咨询当地就业市场信息或查看招聘网站。"
+                value=5000.0,
+                step=100.0,
+                help=f"🎓 请输入一年的学费总额（{currency_symbol}）。包括：学费、注册费、杂费等。如果选择「一次性」支付，学费将在9月（第一个月）全部扣除；如果选择「分期」，将分10个月平均支付。"
             )
-        
-        st.markdown("---")
-        
-        # 财务信息
-        initial_deposit = st.number_input(
-            f"初始存款（{currency_symbol}）",
-            min_value=0.0,
-            value=5000.0,
-            step=100.0,
-            help=f"💵 请输入你开始留学时拥有的存款金额（{currency_symbol}）。这是你计算现金流的起始资金。建议包括：学费、生活费、应急资金等。如果初始存款不足，系统会提示需要父母支持。"
-        )
-        
-        tuition_total = st.number_input(
-            f"学费总额（{currency_symbol}）",
-            min_value=0.0,
-            value=5000.0,
-            step=100.0,
-            help=f"🎓 请输入一年的学费总额（{currency_symbol}）。包括：学费、注册费、杂费等。如果选择「一次性」支付，学费将在9月（第一个月）全部扣除；如果选择「分期」，将分10个月平均支付。"
-        )
-        
-        tuition_payment = st.selectbox(
-            "学费支付方式",
-            ["一次性", "分期"],
-            help="💳 **一次性支付**：在9月（开学时）一次性支付全部学费，适合有足够初始存款的情况。**分期支付**：分10个月（9月到次年6月）平均支付，每月支付学费总额的1/10，适合资金紧张的情况。"
-        )
-        
-        st.markdown("---")
-        
-        # 计算按钮
-        calculate_button = st.button("🚀 开始计算", type="primary", use_container_width=True)
+            
+            tuition_payment = st.selectbox(
+                "学费支付方式",
+                ["一次性", "分期"],
+                help="💳 **一次性支付**：在9月（开学时）一次性支付全部学费，适合有足够初始存款的情况。**分期支付**：分10个月（9月到次年6月）平均支付，每月支付学费总额的1/10，适合资金紧张的情况。"
+            )
+            
+            st.markdown("---")
+            
+            # 计算按钮
+            calculate_button = st.form_submit_button("🚀 开始计算", type="primary", use_container_width=True)
     
     # 主内容区
     if calculate_button:
         # 验证输入：如果打工但小时工资为0，提示用户
         if has_job and hourly_wage == 0.0:
+            # 本次提交被拒绝，清除旧结果，避免之后的重跑又显示上一次的计算
+            st.session_state.pop('last_calculation', None)
             st.warning("⚠️ **小时工资未填写**")
             st.info("""
             💡 **提示**：
@@ -173,305 +321,263 @@ def main():
             """)
             st.stop()
         
-        with st.spinner("正在计算，请稍候..."):
-            try:
-                # 创建计算器实例
-                calculator = StudyCostCalculator(
-                    country=country,
-                    city=city,
-                    rent_type=rent_type,
-                    has_job=has_job,
-                    weekly_hours=weekly_hours,
-                    hourly_wage=hourly_wage,
-                    initial_deposit=initial_deposit,
-                    tuition_total=tuition_total,
-                    tuition_payment=tuition_payment
-                )
-                
-                # 执行计算
-                summary = calculator.get_summary()
-                df = summary["cashflow_df"]
-                
-                # 缓存结果到session_state
-                st.session_state['last_calculation'] = {
-                    'calculator': calculator,
-                    'summary': summary,
-                    'df': df,
-                    'country': country,
-                    'city': city
-                }
-                
-                # 显示结果
-                st.success("✅ 计算完成！")
-                
-                # 显示城市信息和数据来源
-                currency_symbol = summary['currency_symbol']
-                st.info(f"📍 **{country} - {city}** | 💰 货币: {summary['currency']} ({currency_symbol})")
-                
-                # 数据来源
-                with st.expander("📚 数据来源和依据"):
-                    st.write("**生活成本数据来源：**")
-                    for i, source in enumerate(summary['data_sources'], 1):
-                        st.write(f"{i}. {source}")
-                    st.caption("💡 数据基于2024年最新统计，仅供参考。实际成本可能因个人情况而异。")
-                
-                # 创建两列布局
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.metric("月收入", f"{summary['monthly_income']:.2f} {currency_symbol}")
-                    st.metric("月基础支出", f"{summary['monthly_expense_base']:.2f} {currency_symbol}")
-                    st.caption(f"其中：房租 {summary['monthly_rent']:.2f} {currency_symbol}，生活费 {summary['monthly_living_cost']:.2f} {currency_symbol}")
-                
-                with col2:
-                    st.metric("最终余额", f"{summary['final_balance']:.2f} {currency_symbol}")
-                    st.metric("最低余额", f"{summary['min_balance']:.2f} {currency_symbol}")
-                
-                st.markdown("---")
-                
-                # 危险月份提示
-                if summary["critical_months"]:
-                    st.markdown('<div class="warning-box">', unsafe_allow_html=True)
-                    st.warning(f"⚠️ **危险月份**: {', '.join(summary['critical_months'])}")
-                    if summary["need_support"] > 0:
-                        st.warning(f"💸 **需要父母补钱**: {summary['need_support']:.2f} {currency_symbol}")
-                    st.markdown('</div>', unsafe_allow_html=True)
-                else:
-                    st.markdown('<div class="success-box">', unsafe_allow_html=True)
-                    st.success("✅ **财务状况良好**！全年余额均为正，无需额外支持。")
-                    st.markdown('</div>', unsafe_allow_html=True)
-                
-                st.markdown("---")
-                
-                # 现金流表格
-                st.subheader("📊 12个月现金流明细")
-                st.dataframe(df, use_container_width=True, hide_index=True)
-                
-                # 折线图
-                st.subheader("📈 现金流趋势图")
-                fig = create_cashflow_chart(df, currency_symbol)
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # 数据导出
-                st.markdown("---")
-                st.subheader("📥 数据导出")
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    # Excel导出
-                    excel_buffer = BytesIO()
-                    df.to_excel(excel_buffer, index=False, engine='openpyxl')
-                    st.download_button(
-                        label="📗 下载Excel",
-                        data=excel_buffer.getvalue(),
-                        file_name=f"现金流数据_{country}_{city}_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        use_container_width=True
-                    )
-                
-                with col2:
-                    # PDF导出（英文版）
-                    pdf_key = f'pdf_bytes_{country}_{city}'
-                    if pdf_key not in st.session_state:
-                        with st.spinner("正在生成PDF报告..."):
-                            try:
-                                st.session_state[pdf_key] = generate_pdf_report(
-                                    calculator=calculator,
-                                    summary=summary,
-                                    df=df
-                                )
-                            except Exception as e:
-                                st.error(f"❌ 生成PDF失败: {str(e)}")
-                                st.info("💡 如果问题持续，请检查输入数据或联系技术支持")
-                    
-                    # 下载按钮
-                    if pdf_key in st.session_state:
-                        st.download_button(
-                            label="📄 下载PDF报告",
-                            data=st.session_state[pdf_key],
-                            file_name=f"留学生成本报告_{country}_{city}_{datetime.now().strftime('%Y%m%d')}.pdf",
-                            mime="application/pdf",
-                            use_container_width=True
-                        )
-                
-            except InvalidInputError as e:
-                st.error(f"❌ **输入错误**")
-                st.warning(f"{str(e)}")
-                st.info("""
-                💡 **解决建议**：
-                - 检查国家、城市选择是否正确
-                - 确认所有数值输入不为负数
-                - 如果打工，确保小时工资大于0
-                - 检查学费支付方式选择是否正确
-                """)
-            except CalculationError as e:
-                st.error(f"❌ **计算出错**")
-                st.warning(f"{str(e)}")
-                st.info("""
-                💡 **解决建议**：
-                - 检查输入数据是否合理
-                - 尝试重新填写信息
-                - 如果问题持续，请检查数据配置
-                """)
-            except Exception as e:
-                st.error(f"❌ **发生未知错误**")
-                st.exception(e)
-                st.warning("""
-                ⚠️ **请截图此错误信息**，包含以下内容：
-                - 错误信息
-                - 你填写的输入信息
-                - 浏览器控制台错误（如有）
-                
-                这将帮助我们快速定位和解决问题。
-                """)
-    
-    else:
-        # 初始状态 - 显示使用说明
-        st.info("👈 **开始使用**：请在左侧边栏填写信息，然后点击「🚀 开始计算」按钮")
-        
-        # 使用说明
-        st.markdown("### 📖 使用指南")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("""
-            #### 🎯 快速开始（4步）
-            
-            1. **🌍 选择留学目的地**
-               - 先选择国家，再选择城市
-               - 系统自动显示该城市的货币信息
-            
-            2. **🏠 选择住宿类型**
-               - 单间/合租/宿舍
-               - 系统自动匹配该城市的房租数据
-            
-            3. **💼 填写打工信息**（可选）
-               - 勾选「是否打工」
-               - 填写每周工作小时数
-               - **手动输入小时工资**（必须填写）
-            
-            4. **💰 输入财务信息**
-               - 初始存款（当地货币）
-               - 学费总额（当地货币）
-               - 学费支付方式
-            """)
-        
-        with col2:
-            st.markdown("""
-            #### 📊 查看结果
-            
-            - **关键指标**：月收入、月支出、最终余额、最低余额
-            - **12个月现金流明细表**：详细展示每月收支情况
-            - **可视化图表**：累计余额趋势 + 月度收入支出对比
-            - **危险月份提醒**：自动标识资金紧张的月份
-            - **数据来源**：点击查看每项成本的数据依据
-            - **导出报告**：支持CSV、Excel、PDF格式
-            """)
-        
-        st.markdown("---")
+        # 全部计算输入（顺序与StudyCostCalculator构造参数一致，用作缓存键）
+        params = (country, city, rent_type, has_job, weekly_hours, hourly_wage,
+                  initial_deposit, tuition_total, tuition_payment)
         
-        # 重要提示
-        st.markdown("### 💡 重要提示")
+        # 报告日期（PDF缓存键和导出文件名共用）
+        report_date = datetime.now().strftime('%Y%m%d')
         
-        tab1, tab2, tab3 = st.tabs(["📚 数据说明", "⚠️ 注意事项", "❓ 常见问题"])
+        # 输入和报告日期与上次计算完全相同时直接复用session_state中的结果，跳过计算和导出文件序列化
+        # （上次PDF生成失败时不复用，重新走完整流程以重试PDF）
+        last_calculation = st.session_state.get('last_calculation')
+        if (last_calculation is not None and last_calculation['params'] == params
+                and last_calculation['report_date'] == report_date
+                and last_calculation['pdf'] is not None):
+            st.success("✅ 计算完成！")
+            _render_results(last_calculation)
+            return
         
-        with tab1:
-            st.markdown("""
-            #### 📚 数据来源和依据
-            
-            - **生活成本数据**：来自Numbeo、Expatistan、各国官方统计局等权威机构
-            - **数据更新**：基于2024年最新统计数据
-            - **数据范围**：包括房租（单间/合租/宿舍）和月生活费（食物、交通、娱乐等）
-            - **查看来源**：计算完成后，点击「📚 数据来源和依据」查看详细来源
-            
-            ⚠️ **免责声明**：数据仅供参考，实际成本可能因个人情况、地区差异、时间变化而有所不同。
-            """)
+        # 新一轮计算前清除旧结果，计算失败时不显示过期数据
+        st.session_state.pop('last_calculation', None)
         
-        with tab2:
-            st.markdown("""
-            #### ⚠️ 使用注意事项
+        try:
+            # 执行计算（相同输入直接复用缓存结果）
+            summary = _compute(params)
+            df = summary["cashflow_df"]
             
-            1. **小时工资必须手动输入**
-               - 系统不会自动填充默认值
-               - 如果勾选了「是否打工」但小时工资为0，系统会提示
-               - 建议根据实际或预期工资填写
+            # 导出文件在计算时序列化一次，之后的重跑直接从session_state读取
+            pdf_bytes, pdf_error = None, None
+            try:
+                pdf_bytes = _cached_pdf(params, report_date)
+            except Exception as e:
+                pdf_error = str(e)
             
-            2. **货币单位**
-               - 所有金额使用当地货币
-               - 系统自动识别并显示正确的货币符号
-               - 如需转换，请使用实时汇率
+            # 缓存结果到session_state（保存输入参数，需要时可重建计算器）
+            st.session_state['last_calculation'] = {
+                'params': params,
+                'report_date': report_date,
+                'summary': summary,
+                'df': df,
+                'country': country,
+                'city': city,
+                'excel': _excel_bytes(df),
+                'pdf': pdf_bytes,
+                'pdf_error': pdf_error
+            }
             
-            3. **计算结果**
-               - 如果余额为负（红色区域），表示该月资金不足
-               - 系统会计算需要父母补钱的金额
-               - 建议增加初始存款或调整支出计划
+            # 显示结果
+            st.success("✅ 计算完成！")
             
-            4. **数据准确性**
-               - 生活成本数据为平均值，仅供参考
-               - 实际成本可能因个人消费习惯而异
-               - 建议结合个人实际情况调整
+        except InvalidInputError as e:
+            st.error(f"❌ **输入错误**")
+            st.warning(f"{str(e)}")
+            st.info("""
+            💡 **解决建议**：
+            - 检查国家、城市选择是否正确
+            - 确认所有数值输入不为负数
+            - 如果打工，确保小时工资大于0
+            - 检查学费支付方式选择是否正确
             """)
-        
-        with tab3:
-            st.markdown("""
-            #### ❓ 常见问题
-            
-            **Q1: 如何选择住宿类型？**
-            - 单间：独立房间，通常包含独立卫浴，价格较高
-            - 合租：与他人共享公共区域，价格经济实惠
-            - 宿舍：学校提供的学生宿舍，通常包含基本设施，价格适中
-            
-            **Q2: 小时工资应该填多少？**
-            - 请填写你的实际或预期小时工资
-            - 不同行业和职位工资差异较大
-            - 建议查看当地招聘网站或咨询就业市场信息
-            
-            **Q3: 学费分期支付是什么意思？**
-            - 分期支付：分10个月（9月到次年6月）平均支付
-            - 每月支付金额 = 学费总额 ÷ 10
-            - 适合资金紧张的情况，可以分散支出压力
-            
-            **Q4: 如果余额为负怎么办？**
-            - 系统会标识危险月份和需要补钱的金额
-            - 建议：增加初始存款、增加工作时间、选择更便宜的住宿方式
+        except CalculationError as e:
+            st.error(f"❌ **计算出错**")
+            st.warning(f"{str(e)}")
+            st.info("""
+            💡 **解决建议**：
+            - 检查输入数据是否合理
+            - 尝试重新填写信息
+            - 如果问题持续，请检查数据配置
+            """)
+        except Exception as e:
+            st.error(f"❌ **发生未知错误**")
+            st.exception(e)
+            st.warning("""
+            ⚠️ **请截图此错误信息**，包含以下内容：
+            - 错误信息
+            - 你填写的输入信息
+            - 浏览器控制台错误（如有）
             
-            **Q5: 数据来源可靠吗？**
-            - 数据来自Numbeo、Expatistan、各国官方统计局等权威机构
-            - 点击「数据来源和依据」可查看详细来源
-            - 数据基于2024年最新统计，但仅供参考
+            这将帮助我们快速定位和解决问题。
             """)
-        
-        st.markdown("---")
-        
-        # 功能特色
-        st.markdown("### ✨ 功能特色")
-        st.markdown("""
-        - 🌍 **全球支持**：20+个国家，50+个城市
-        - 📚 **数据透明**：每项成本都有明确的来源依据
-        - 💰 **灵活配置**：支持自定义小时工资
-        - 📊 **可视化分析**：图表直观展示现金流趋势
-        - 📥 **多格式导出**：支持CSV、Excel、PDF
-        - ⚠️ **智能提醒**：自动识别危险月份和资金缺口
-        """)
-
-
-def create_cashflow_chart(df: pd.DataFrame, currency_symbol: str = "€") -> go.Figure:
+    
+    if 'last_calculation' in st.session_state:
+        # 显示最近一次计算结果（下载等操作触发的重跑也保留结果）
+        _render_results(st.session_state['last_calculation'])
+    elif not calculate_button:
+        # 初始状态 - 显示使用说明
+        _render_guide()
+
+
+def _render_results(calculation: dict):
+    """
+    渲染计算结果
+    
+    参数:
+        calculation: session_state中保存的最近一次计算结果
+    """
+    summary = calculation['summary']
+    df = calculation['df']
+    country = calculation['country']
+    city = calculation['city']
+    currency_symbol = summary['currency_symbol']
+    report_date = calculation['report_date']
+    
+    # 显示城市信息和数据来源
+    st.info(f"📍 **{country} - {city}** | 💰 货币: {summary['currency']} ({currency_symbol})")
+    
+    # 数据来源
+    with st.expander("📚 数据来源和依据"):
+        st.write("**生活成本数据来源：**")
+        for i, source in enumerate(summary['data_sources'], 1):
+            st.write(f"{i}. {source}")
+        st.caption("💡 数据基于2024年最新统计，仅供参考。实际成本可能因个人情况而异。")
+    
+    # 创建两列布局
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.metric("月收入", f"{summary['monthly_income']:.2f} {currency_symbol}")
+        st.metric("月基础支出", f"{summary['monthly_expense_base']:.2f} {currency_symbol}")
+        st.caption(f"其中：房租 {summary['monthly_rent']:.2f} {currency_symbol}，生活费 {summary['monthly_living_cost']:.2f} {currency_symbol}")
+    
+    with col2:
+        st.metric("最终余额", f"{summary['final_balance']:.2f} {currency_symbol}")
+        st.metric("最低余额", f"{summary['min_balance']:.2f} {currency_symbol}")
+    
+    st.markdown("---")
+    
+    # 危险月份提示
+    if summary["critical_months"]:
+        st.markdown('<div class="warning-box">', unsafe_allow_html=True)
+        st.warning(f"⚠️ **危险月份**: {', '.join(summary['critical_months'])}")
+        if summary["need_support"] > 0:
+            st.warning(f"💸 **需要父母补钱**: {summary['need_support']:.2f} {currency_symbol}")
+        st.markdown('</div>', unsafe_allow_html=True)
+    else:
+        st.markdown('<div class="success-box">', unsafe_allow_html=True)
+        st.success("✅ **财务状况良好**！全年余额均为正，无需额外支持。")
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    # 现金流表格
+    st.subheader("📊 12个月现金流明细")
+    # 仅12行数据，使用静态表格渲染（以月份为索引，金额保留两位小数）
+    st.table(df.set_index(summary['columns']['month']).style.format("{:.2f}"))
+    
+    # 折线图
+    st.subheader("📈 现金流趋势图")
+    interactive = st.toggle(
+        "交互式图表",
+        help="默认显示静态图片以加快页面加载；开启后可悬停查看每月具体数值。"
+    )
+    chart_png = None
+    if not interactive:
+        try:
+            chart_png = _chart_png(df, currency_symbol, summary['columns'])
+        except Exception:
+            logger.exception("静态图表导出失败（请检查kaleido安装），回退到交互式图表")
+    if chart_png is not None:
+        st.image(chart_png)
+    else:
+        # 选择交互式图表，或静态图片导出不可用时回退
+        if not interactive:
+            st.caption("⚠️ 静态图片导出不可用，已显示交互式图表")
+        fig = create_cashflow_chart(df, currency_symbol, summary['columns'])
+        st.plotly_chart(fig, use_container_width=True)
+    
+    # 数据导出
+    st.markdown("---")
+    st.subheader("📥 数据导出")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Excel导出
+        st.download_button(
+            label="📗 下载Excel",
+            data=calculation['excel'],
+            file_name=f"现金流数据_{country}_{city}_{report_date}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            use_container_width=True
+        )
+    
+    with col2:
+        # PDF导出（英文版）
+        if calculation['pdf'] is None:
+            st.error(f"❌ 生成PDF失败: {calculation['pdf_error']}")
+            st.info("💡 如果问题持续，请检查输入数据或联系技术支持")
+        else:
+            st.download_button(
+                label="📄 下载PDF报告",
+                data=calculation['pdf'],
+                file_name=f"留学生成本报告_{country}_{city}_{report_date}.pdf",
+                mime="application/pdf",
+                use_container_width=True
+            )
+
+
+def _render_guide():
+    """渲染初始状态的使用指南（文案为模块级常量）"""
+    st.info("👈 **开始使用**：请在左侧边栏填写信息，然后点击「🚀 开始计算」按钮")
+    
+    # 使用说明
+    st.markdown("### 📖 使用指南")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown(_GUIDE_LEFT)
+    
+    with col2:
+        st.markdown(_GUIDE_RIGHT)
+    
+    st.markdown("---")
+    
+    # 重要提示
+    st.markdown("### 💡 重要提示")
+    
+    tab1, tab2, tab3 = st.tabs(["📚 数据说明", "⚠️ 注意事项", "❓ 常见问题"])
+    
+    with tab1:
+        st.markdown(_TAB1)
+    
+    with tab2:
+        st.markdown(_TAB2)
+    
+    with tab3:
+        st.markdown(_TAB3)
+    
+    st.markdown("---")
+    
+    # 功能特色
+    st.markdown("### ✨ 功能特色")
+    st.markdown(_FEATURES)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def create_cashflow_chart(df: pd.DataFrame, currency_symbol: str,
+                          columns: Dict[str, str]) -> "go.Figure":
     """
     创建增强版现金流图表（显示累计余额和收入支出对比）
     
+    使用st.cache_data按DataFrame内容和货币符号缓存，输入不变时直接复用已构建的图表
+    
     参数:
         df: 现金流DataFrame
         currency_symbol: 货币符号
+        columns: 列名映射（summary['columns']）
         
     返回:
         Plotly图表对象
     """
-    # 动态获取列名
-    balance_col = [col for col in df.columns if "累计余额" in col][0]
-    income_col = [col for col in df.columns if "月收入" in col][0]
-    expense_col = [col for col in df.columns if "月支出" in col][0]
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    
+    month_col = columns["month"]
+    balance_col = columns["balance"]
+    income_col = columns["income"]
+    expense_col = columns["expense"]
     
     fig = make_subplots(
         rows=2, cols=1,
@@ -483,7 +589,7 @@ def create_cashflow_chart(df: pd.DataFrame, currency_symbol: str = "€") -> go.
     # 累计余额折线
     fig.add_trace(
         go.Scatter(
-            x=df["月份"],
+            x=df[month_col],
             y=df[balance_col],
             mode='lines+markers',
             name='累计余额',
@@ -497,7 +603,7 @@ def create_cashflow_chart(df: pd.DataFrame, currency_symbol: str = "€") -> go.
     # 收入支出柱状图
     fig.add_trace(
         go.Bar(
-            x=df["月份"],
+            x=df[month_col],
             y=df[income_col],
             name='月收入',
             marker_color='#2ecc71',
@@ -508,7 +614,7 @@ def create_cashflow_chart(df: pd.DataFrame, currency_symbol: str = "€") -> go.
     
     fig.add_trace(
         go.Bar(
-            x=df["月份"],
+            x=df[month_col],
             y=df[expense_col],
             name='月支出',
             marker_color='#e74c3c',
@@ -547,6 +653,85 @@ def create_cashflow_chart(df: pd.DataFrame, currency_symbol: str = "€") -> go.
     return fig
 
 
+@st.cache_data(max_entries=32, show_spinner="正在生成图表...")
+def _chart_png(df: pd.DataFrame, currency_symbol: str, columns: Dict[str, str]) -> bytes:
+    """
+    将现金流图表渲染为PNG图片并缓存
+    
+    参数:
+        df: 现金流DataFrame
+        currency_symbol: 货币符号
+        columns: 列名映射（summary['columns']）
+        
+    返回:
+        PNG图片的字节数据
+        
+    异常:
+        静态导出不可用（如kaleido未安装或启动失败）时抛出；异常不会被缓存，下次重跑会重试
+    """
+    fig = create_cashflow_chart(df, currency_symbol, columns)
+    return fig.to_image(format="png", width=1100, height=700, scale=2)
+
+
+@st.cache_data(max_entries=512, show_spinner="正在计算，请稍候...")
+def _compute(params: tuple) -> dict:
+    """
+    执行现金流计算并按输入参数缓存
+    
+    参数:
+        params: StudyCostCalculator的构造参数元组
+        
+    返回:
+        get_summary()返回的摘要字典（仅包含可序列化对象）
+        
+    异常:
+        InvalidInputError: 输入无效时抛出
+        CalculationError: 计算出错时抛出
+    """
+    return StudyCostCalculator(*params).get_summary()
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _excel_bytes(df: pd.DataFrame) -> bytes:
+    """
+    将现金流DataFrame导出为Excel并缓存字节数据
+    
+    参数:
+        df: 现金流DataFrame
+        
+    返回:
+        Excel文件的字节数据
+    """
+    from io import BytesIO
+    
+    excel_buffer = BytesIO()
+    df.to_excel(excel_buffer, index=False, engine='xlsxwriter')
+    return excel_buffer.getvalue()
+
+
+@st.cache_data(max_entries=32, show_spinner="正在生成PDF报告...")
+def _cached_pdf(params: tuple, report_date: str) -> bytes:
+    """
+    生成PDF报告并按全部计算输入和生成日期缓存
+    
+    参数:
+        params: StudyCostCalculator的构造参数元组
+        report_date: 生成日期（YYYYMMDD），仅作为缓存键，保证页脚的生成时间不会跨天复用
+        
+    返回:
+        PDF文件的字节数据
+    """
+    from pdf_generator import generate_pdf_report
+    
+    calculator = StudyCostCalculator(*params)
+    summary = _compute(params)
+    return generate_pdf_report(
+        calculator=calculator,
+        summary=summary,
+        df=summary["cashflow_df"]
+    )
+
+
 if __name__ == "__main__":
     main()
 
@@ -14,6 +14,7 @@
 - 提取配置常量
 """
 
+import numpy as np
 import pandas as pd
 from typing import Dict, Tuple, List, Optional
 from datetime import datetime
@@ -33,6 +34,40 @@ class InvalidInputError(CalculationError):
     pass
 
 
+def _cashflow_kernel(incomes: np.ndarray, expenses: np.ndarray, initial: float) -> np.ndarray:
+    """
+    逐月累计余额的数值内核（使用np.cumsum向量化，不涉及DataFrame）
+    
+    参数:
+        incomes: 每月收入数组
+        expenses: 每月支出数组
+        initial: 初始存款
+        
+    返回:
+        每月累计余额数组
+    """
+    return initial + np.cumsum(incomes - expenses)
+
+
+def get_cashflow_columns(currency_symbol: str) -> Dict[str, str]:
+    """
+    获取现金流DataFrame的列名（含货币符号）
+    
+    参数:
+        currency_symbol: 货币符号
+        
+    返回:
+        {"month", "income", "expense", "balance"} 到实际列名的映射
+    """
+    currency_col = f"（{currency_symbol}）"
+    return {
+        "month": "月份",
+        "income": f"月收入{currency_col}",
+        "expense": f"月支出{currency_col}",
+        "balance": f"累计余额{currency_col}"
+    }
+
+
 class StudyCostCalculator:
     """留学生成本计算器核心类（全球版）"""
     
@@ -182,44 +217,30 @@ class StudyCostCalculator:
             CalculationError: 计算出错时抛出
         """
         try:
-            months = []
-            incomes = []
-            expenses = []
-            balances = []
-            cumulative_balance = self.initial_deposit
-            
             # 生成12个月的数据（从9月开始，假设是学年开始）
-            month_names = ["9月", "10月", "11月", "12月", "1月", "2月", 
-                          "3月", "4月", "5月", "6月", "7月", "8月"]
+            months = ["9月", "10月", "11月", "12月", "1月", "2月", 
+                      "3月", "4月", "5月", "6月", "7月", "8月"]
+            
+            # 月收入和月支出（按月广播常量，一次分配整个数组）
+            incomes = np.full(len(months), self.monthly_income, dtype=np.float64)
+            expenses = np.full(len(months), self.monthly_rent + self.monthly_living_cost, dtype=np.float64)
+            
+            # 学费处理
+            if self.tuition_payment == "一次性":
+                expenses[0] += self.tuition_total  # 9月一次性支付
+            elif self.tuition_payment == "分期":
+                expenses[:self.TUITION_PAYMENT_MONTHS] += self.tuition_monthly  # 9月到6月分期支付
             
-            for i, month_name in enumerate(month_names):
-                # 月收入
-                income = self.monthly_income
-                
-                # 月支出
-                expense = self.monthly_rent + self.monthly_living_cost
-                
-                # 学费处理
-                if self.tuition_payment == "一次性" and i == 0:  # 9月一次性支付
-                    expense += self.tuition_total
-                elif self.tuition_payment == "分期" and i < self.TUITION_PAYMENT_MONTHS:  # 9月到6月分期支付
-                    expense += self.tuition_monthly
-                
-                # 计算余额
-                cumulative_balance = cumulative_balance + income - expense
-                
-                months.append(month_name)
-                incomes.append(round(income, 2))
-                expenses.append(round(expense, 2))
-                balances.append(round(cumulative_balance, 2))
+            # 计算累计余额
+            balances = _cashflow_kernel(incomes, expenses, float(self.initial_deposit))
             
             # 创建DataFrame（使用动态货币符号）
-            currency_col = f"（{self.currency_symbol}）"
+            columns = get_cashflow_columns(self.currency_symbol)
             df = pd.DataFrame({
-                "月份": months,
-                f"月收入{currency_col}": incomes,
-                f"月支出{currency_col}": expenses,
-                f"累计余额{currency_col}": balances
+                columns["month"]: months,
+                columns["income"]: np.round(incomes, 2),
+                columns["expense"]: np.round(expenses, 2),
+                columns["balance"]: np.round(balances, 2)
             })
             
             return df
@@ -237,16 +258,15 @@ class StudyCostCalculator:
             (危险月份列表, 需要补钱的总额)
         """
         try:
-            # 动态获取余额列名
-            balance_col = [col for col in df.columns if "累计余额" in col][0]
-            min_balance = df[balance_col].min()
+            columns = get_cashflow_columns(self.currency_symbol)
+            balances = df[columns["balance"]].to_numpy()
+            min_balance = balances.min()
             
-            # 找出所有负余额的月份（修复：直接获取所有负余额月份，避免重复）
-            negative_months_df = df[df[balance_col] < 0]
-            critical_months = negative_months_df["月份"].tolist() if len(negative_months_df) > 0 else []
+            # 找出所有负余额的月份（布尔索引一次取出）
+            critical_months = df[columns["month"]].to_numpy()[balances < 0].tolist()
             
             # 计算需要补钱的总额（如果最低余额为负）
-            need_support = abs(min_balance) if min_balance < 0 else 0.0
+            need_support = float(abs(min_balance)) if min_balance < 0 else 0.0
             
             return critical_months, need_support
         except Exception as e:
@@ -266,8 +286,8 @@ class StudyCostCalculator:
             df = self.calculate_cashflow()
             critical_months, need_support = self.find_critical_months(df)
             
-            # 动态获取余额列名
-            balance_col = [col for col in df.columns if "累计余额" in col][0]
+            columns = get_cashflow_columns(self.currency_symbol)
+            balance_col = columns["balance"]
             
             return {
                 "country": self.country,
@@ -282,6 +302,7 @@ class StudyCostCalculator:
                 "critical_months": critical_months,
                 "need_support": need_support,
                 "cashflow_df": df,
+                "columns": columns,
                 "data_sources": self.data_sources,
                 "monthly_rent": self.monthly_rent,
                 "monthly_living_cost": self.monthly_living_cost